@@ -1,7 +1,14 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pygame
 import numpy as np
-import random
 import maze as mz
+import levels as lv
+import maze_library as ml
+import maze_prefetch as mp
+import spatial_hash as sh
+import rect_merge as rm
 import button as bn
 
 
@@ -21,7 +28,22 @@ WALL_COLOR = YELLOW
 START_COLOR = YELLOW
 END_COLOR = YELLOW
 
-LEVELS = {'easy': [10, 12], 'med': [25, 30], 'hard': [50, 60]}
+# pre-built maze libraries, <MAZE_LIBRARY_DIR>/<level>.zmlb (made with maze_library.py);
+# levels without a library get a newly generated maze
+MAZE_LIBRARY_DIR = "mazes"
+MAZE_LIBRARIES = {}
+# ready mazes kept per level by the background prefetcher
+MAZE_PREFETCH_DEPTH = mp.PREFETCH_DEPTH
+MAZE_PREFETCHER = None
+# mazes of play() are generated and built on this worker thread, LOAD_SLICE_MS at a time
+MAZE_LOADER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="maze-loader")
+LOAD_SLICE_MS = 10
+# play loop redraws only the changed parts of the window (draw_window_dirty) instead of the whole window
+DIRTY_RECTS = True
+
+# bit (maze.DIRECTION_BITS) of every parent direction, 0 for none
+PARENT_BITS = np.zeros(9, dtype=np.uint8)
+PARENT_BITS[list(mz.DIRECTION_BITS)] = list(mz.DIRECTION_BITS.values())
 
 # Window size
 WINDOW_LENGTH = 600  # *
@@ -75,18 +97,20 @@ class Player(pygame.sprite.Sprite):
         old_player_x, old_player_y = self.rect.center
         keys_pressed = pygame.key.get_pressed()
         if self.keep_moving:
+            direction = None
             if keys_pressed[pygame.K_LEFT] and self.rect.centerx - self.rect.width * 0.5 > 0:
-                self.rect.centerx -= self.vel
+                direction = 4
             elif keys_pressed[pygame.K_RIGHT] and self.rect.centerx + self.rect.width * 0.5 < WINDOW_LENGTH:
-                self.rect.centerx += self.vel
+                direction = 6
             elif keys_pressed[pygame.K_UP] and self.rect.centery - self.rect.height * 0.5 > 0:
-                self.rect.centery -= self.vel
+                direction = 8
             elif keys_pressed[pygame.K_DOWN] and self.rect.centery + self.rect.height < WINDOW_LENGTH:
-                self.rect.centery += self.vel
+                direction = 2
 
-            collided_sprites = pygame.sprite.spritecollide(self, WALLS, False)
-            if collided_sprites:
-                self.rect.center = old_player_x, old_player_y
+            # walls are looked up in the cells around the player (can_move), not collided with
+            if direction and can_move((old_player_x, old_player_y), direction):
+                di, dj = mz.DIRECTION_STEPS[direction]
+                self.rect.center = old_player_x + dj * self.vel, old_player_y + di * self.vel
 
             pygame.time.wait(35)
         else:
@@ -99,92 +123,71 @@ class Player(pygame.sprite.Sprite):
                 self.keep_moving = False
 
 
+def can_move(center, direction):
+    """
+    Tells if the player can take a step (half a cell) from center in direction, from the openings
+    of the cell it is in (CELL_OPENINGS) instead of colliding it with every wall.
+    The player stands at cell centers or halfway between two cells:
+    from a cell center it can go towards an opening of the cell, from between two cells
+    only on into either of them (along the border it would run into the wall corners).
+
+    :param center: (x, y) pixel center of the player
+    :param direction: direction of the step
+    :return: True if the step doesn't run into a wall
+    """
+    # position in half cells: odd => cell center, even => cell border
+    half_x, half_y = round(center[0] * 2 / SQ_LENGTH), round(center[1] * 2 / SQ_LENGTH)
+    di, dj = mz.DIRECTION_STEPS[direction]
+    if half_x % 2 and half_y % 2:
+        return bool(CELL_OPENINGS[half_y // 2 * GRID_LENGTH + half_x // 2] & mz.DIRECTION_BITS[direction])
+    if dj and half_y % 2 and not half_x % 2:
+        return 0 <= (half_x + dj) // 2 < GRID_LENGTH
+    if di and half_x % 2 and not half_y % 2:
+        return 0 <= (half_y + di) // 2 < GRID_LENGTH
+    return False
+
+
+def collide_walls(sprite):
+    """
+    spritecollide(sprite, WALLS, False) for any sprite, looked up in WALL_INDEX
+    (only the walls near the sprite are tested).
+    :return: list of walls colliding with sprite
+    """
+    return WALL_INDEX.query_rect(sprite.rect)
+
+
 def draw_maze(grid):
     """
     Adds all walls of maze as sprites into pygame.sprite.Group() based on directions of grid_graph.
+    Pattern ids of all cells are looked up at once (MAZE.cell_pattern_ids),
+    then the matching draw_pattern_in_game function adds the walls of each cell;
+    finally the walls are merged into maximal rectangles (rect_merge.merge_rects).
 
     :param grid: grid_graph (will be named "maze") object outputted by make_maze in maze.py
     """
-    x_axis = np.linspace(0, GRID_LENGTH - 1, GRID_LENGTH)
-    y_axis = np.linspace(0, GRID_LENGTH - 1, GRID_LENGTH)
-    x_grid, y_grid = np.meshgrid(x_axis, y_axis)
+    st_x, st_y = MAZE.start_coord
+    decide_entrance_direction_of_maze_from_start_node(grid[st_x][st_y], st_x, st_y)
+    end_x, end_y = MAZE.end_coord
+    decide_exit_direction_of_maze_from_end_node(grid[end_x][end_y])
 
-    for x, y in zip(x_grid.flatten(), y_grid.flatten()):
-        # go to each cell/node of grid and draw on an 8 by 8 square
-        x = int(x)
-        y = int(y)
-        node = grid[x][y]
+    pattern_ids = MAZE.cell_pattern_ids()
+    # Shouldn't be any other types of cells/nodes
+    mz.report_invalid_cells(pattern_ids)
 
-        if node.is_start:
-            decide_entrance_direction_of_maze_from_start_node(node, x, y)
-            parent_dir = node.parent_direction
+    # go to each cell/node of grid and draw its pattern
+    for (x, y), pattern_id in np.ndenumerate(pattern_ids):
+        if pattern_id:
+            DRAW_PATTERN_IN_GAME[pattern_id](y, x)
 
-        elif node.is_end:
-            decide_exit_direction_of_maze_from_end_node(node)
-            parent_dir = node.parent_direction
-        else:
-            parent_dir = node.parent_direction
-
-        directions = set([neigh[0] for neigh in node.neighbors])
-
-        # 15 different drawing patterns for each cell
-        if 'f' in directions or 'd' in directions:  # (ㄷ), f=fin, d=deadend
-            if parent_dir == 2:
-                draw_pattern_in_game_1(y, x)
-            elif parent_dir == 4:
-                draw_pattern_in_game_2(y, x)
-            elif parent_dir == 6:
-                draw_pattern_in_game_3(y, x)
-            elif parent_dir == 8:
-                draw_pattern_in_game_4(y, x)
-        # 2 ways cell/node
-        elif len(directions) == 1:
-            one_dir = list(directions)[0]
-            # (ㅡ, ㅣ)
-            if (one_dir == 2 and parent_dir == 8) or (one_dir == 8 and parent_dir == 2):
-                draw_pattern_in_game_5(y, x)
-            elif (one_dir == 4 and parent_dir == 6) or (one_dir == 6 and parent_dir == 4):
-                draw_pattern_in_game_6(y, x)
-            # (ㄱ, ㄴ)
-            elif (one_dir == 2 and parent_dir == 6) or (one_dir == 6 and parent_dir == 2):
-                draw_pattern_in_game_7(y, x)
-            elif (one_dir == 2 and parent_dir == 4) or (one_dir == 4 and parent_dir == 2):
-                draw_pattern_in_game_8(y, x)
-            elif (one_dir == 4 and parent_dir == 8) or (one_dir == 8 and parent_dir == 4):
-                draw_pattern_in_game_9(y, x)
-            elif (one_dir == 6 and parent_dir == 8) or (one_dir == 8 and parent_dir == 6):
-                draw_pattern_in_game_10(y, x)
-            else:
-                print("while drawing error occurred @ node coordinate: ", node.coordinate)
-        # 3 ways cell/node
-        elif len(directions) == 2:
-            if (({2, 4}.issubset(directions) and parent_dir == 6) or
-                    ({2, 6}.issubset(directions) and parent_dir == 4) or
-                    ({4, 6}.issubset(directions) and parent_dir == 2)):
-                draw_pattern_in_game_11(y, x)
-            elif (({2, 4}.issubset(directions) and parent_dir == 8) or
-                  ({2, 8}.issubset(directions) and parent_dir == 4) or
-                  ({4, 8}.issubset(directions) and parent_dir == 2)):
-                draw_pattern_in_game_12(y, x)
-            elif (({4, 6}.issubset(directions) and parent_dir == 8) or
-                  ({4, 8}.issubset(directions) and parent_dir == 6) or
-                  ({6, 8}.issubset(directions) and parent_dir == 4)):
-                draw_pattern_in_game_13(y, x)
-            elif (({2, 6}.issubset(directions) and parent_dir == 8) or
-                  ({2, 8}.issubset(directions) and parent_dir == 6) or
-                  ({6, 8}.issubset(directions) and parent_dir == 2)):
-                draw_pattern_in_game_14(y, x)
-            else:
-                print("while drawing error occurred @ node coordinate: ", node.coordinate)
-        # 4 ways cell/node
-        elif (({4, 6, 8}.issubset(directions) and parent_dir == 2) or
-              ({2, 6, 8}.issubset(directions) and parent_dir == 4) or
-              ({2, 4, 8}.issubset(directions) and parent_dir == 6) or
-              ({2, 4, 6}.issubset(directions) and parent_dir == 8)):
-            draw_pattern_in_game_15(y, x)
-        # Shouldn't be any other types of cells/nodes
-        else:
-            print("while drawing error occurred @ node coordinate: ", node.coordinate)
+    # the 2 - 4 walls per cell merged into maximal bars (same pixels), used for drawing and collision
+    global WALLS
+    WALLS = pygame.sprite.Group([Sprite(x, y, w, h, color=WALL_COLOR)
+                                 for x, y, w, h in rm.merge_rects(tuple(wall.rect) for wall in WALLS)])
+
+    # walls bucketed by screen cell, for collide_walls / wall queries
+    global WALL_INDEX
+    WALL_INDEX = sh.SpatialHash(SQ_LENGTH)
+    WALL_INDEX.add_all(WALLS)
 
 
 def decide_entrance_direction_of_maze_from_start_node(start_node, x_start, y_start):
@@ -195,24 +198,24 @@ def decide_entrance_direction_of_maze_from_start_node(start_node, x_start, y_sta
     :param y_start: y coordinate of grid graph
     """
     if x_start == 0 and y_start == 0:
-        start_node.parent_direction = [4, 8]
+        entrance_directions = [4, 8]
     elif x_start == 0 and y_start == GRID_LENGTH - 1:
-        start_node.parent_direction = [6, 8]
+        entrance_directions = [6, 8]
     elif x_start == GRID_LENGTH - 1 and y_start == 0:
-        start_node.parent_direction = [2, 4]
+        entrance_directions = [2, 4]
     elif x_start == GRID_LENGTH - 1 and y_start == GRID_LENGTH - 1:
-        start_node.parent_direction = [2, 6]
+        entrance_directions = [2, 6]
     elif x_start == 0:
-        start_node.parent_direction = [8]
+        entrance_directions = [8]
     elif x_start == GRID_LENGTH - 1:
-        start_node.parent_direction = [2]
+        entrance_directions = [2]
     elif y_start == 0:
-        start_node.parent_direction = [4]
+        entrance_directions = [4]
     elif y_start == GRID_LENGTH - 1:
-        start_node.parent_direction = [6]
+        entrance_directions = [6]
 
     # pick one entrance direction (from node perspective)
-    start_node.parent_direction = random.sample(start_node.parent_direction, 1)[0]
+    start_node.parent_direction = MAZE.rng.pick(entrance_directions)
 
 
 def decide_exit_direction_of_maze_from_end_node(end_node):
@@ -220,20 +223,11 @@ def decide_exit_direction_of_maze_from_end_node(end_node):
     Entrance direction saved as parent direction of start node.
     :param end_node: end node in grid graph
     """
-    possible_exits_ls = []
-    accessible_directions = MAZE.find_accessible_directions_of_node(end_node)
-    for direction in accessible_directions:
-        if direction == 2:
-            possible_exits_ls.append(8)
-        elif direction == 4:
-            possible_exits_ls.append(6)
-        elif direction == 6:
-            possible_exits_ls.append(4)
-        else:
-            possible_exits_ls.append(2)
+    accessible_directions = MAZE.find_accessible_directions_of_node(end_node.index)
+    possible_exits_ls = [mz.OPPOSITE_DIRECTION[direction] for direction in accessible_directions]
 
     # pick one entrance direction (from node perspective)
-    end_node.neighbors = [(random.sample(possible_exits_ls, 1)[0], MAZE.rand_weight())]
+    end_node.neighbors = [(MAZE.rng.pick(possible_exits_ls), MAZE.rand_weight())]
 
 
 def get_end_node_marker_rect():
@@ -492,28 +486,172 @@ def draw_pattern_in_game_15(x_start, y_start):
     WALLS.add(wall_1, wall_2, wall_3, wall_4)
 
 
+# draw_pattern_in_game function of every pattern id (index 0: invalid cell, nothing drawn)
+DRAW_PATTERN_IN_GAME = (None, draw_pattern_in_game_1, draw_pattern_in_game_2, draw_pattern_in_game_3,
+                        draw_pattern_in_game_4, draw_pattern_in_game_5, draw_pattern_in_game_6,
+                        draw_pattern_in_game_7, draw_pattern_in_game_8, draw_pattern_in_game_9,
+                        draw_pattern_in_game_10, draw_pattern_in_game_11, draw_pattern_in_game_12,
+                        draw_pattern_in_game_13, draw_pattern_in_game_14, draw_pattern_in_game_15)
+
+
+def make_maze_layer():
+    """
+    Composites the background and all walls of the maze once (walls never move).
+    :return: surface of the window size in the display format (convert())
+    """
+    layer = pygame.Surface(WIN.get_size())
+    layer.blit(BACKGROUND2, (0, 0))
+    WALLS.draw(layer)
+    return layer.convert()
+
+
 def draw_window(player, end_of_maze, button):
     """
     *draw on a separate function instead of in the while loop
+    Background and walls come from MAZE_LAYER (one blit), so a frame costs the same for any maze size.
     """
     # WIN.fill(DARKBL)
-    WIN.blit(BACKGROUND2, (0, 0))
+    WIN.blit(MAZE_LAYER, (0, 0))
     button.update(WIN)
     WIN.blit(end_of_maze.image, (end_of_maze.rect.x, end_of_maze.rect.y))
 
     WIN.blit(player.image, player.rect.topleft)
 
-    WALLS.draw(WIN)
     # pygame needs to update once things are added to WIN
     pygame.display.flip()
 
 
-def play(level):
-    clock = pygame.time.Clock()
+def draw_window_dirty(player, end_of_maze, button, last_player_rect, button_changed):
+    """
+    Dirty rectangle version of draw_window: restores the old and new player rect (and the
+    button when its hover state changed) from MAZE_LAYER, draws what overlaps them again
+    and pushes only those rects to the display.
+    :param last_player_rect: rect the player was drawn at last frame
+    :param button_changed: True if the button has to be drawn again
+    :return: rect the player is drawn at now
+    """
+    player_rect = player.rect.copy()
+    dirty = [player_rect.union(last_player_rect)]
+    if button_changed:
+        dirty.append(button.rect)
+    for rect in dirty:
+        WIN.blit(MAZE_LAYER, rect, rect)
 
-    # Maze setting & Make maze (global var)
+    if button.rect.collidelist(dirty) >= 0:
+        button.update(WIN)
+    if end_of_maze.rect.collidelist(dirty) >= 0:
+        WIN.blit(end_of_maze.image, (end_of_maze.rect.x, end_of_maze.rect.y))
+    WIN.blit(player.image, player.rect.topleft)
+
+    pygame.display.update(dirty)
+    return player_rect
+
+
+def get_maze_library(level):
+    """
+    :return: MazeLibrary of the level if its file exists else None (opened once, then reused)
+    """
+    if level not in MAZE_LIBRARIES:
+        path = os.path.join(MAZE_LIBRARY_DIR, level + '.zmlb')
+        MAZE_LIBRARIES[level] = ml.MazeLibrary(path) if os.path.exists(path) else None
+    return MAZE_LIBRARIES[level]
+
+
+def new_level_maze(level):
+    """
+    :return: maze drawn at random from the level's maze library when there is one,
+             else a newly generated maze (levels.make_level_maze)
+    """
+    library = get_maze_library(level)
+    if library:
+        return library.random_maze()
+    return lv.make_level_maze(level)
+
+
+def get_maze_prefetcher():
+    """
+    :return: MazePrefetcher of all levels (started on first call)
+    """
+    global MAZE_PREFETCHER
+    if MAZE_PREFETCHER is None:
+        MAZE_PREFETCHER = mp.MazePrefetcher(new_level_maze, lv.LEVELS, depth=MAZE_PREFETCH_DEPTH)
+    return MAZE_PREFETCHER
+
+
+class MazeLoader:
+    def __init__(self, level, seed=None):
+        """
+        Gets a maze of the level and builds its walls on the MAZE_LOADER thread (future),
+        so the game loop keeps drawing and pumping events meanwhile.
+        A ready maze comes from the prefetcher or the level's library; if there is none
+        (or seed is given) the maze is generated here with a MazeBuilder, in slices of
+        LOAD_SLICE_MS milliseconds, checking for cancel() between slices.
+
+        :param level: key of levels.LEVELS
+        :param seed: generate the maze from this seed; same seed => same maze
+        """
+        self.cancelled = threading.Event()
+        self.builder = None
+        # True once a ready maze was found (nothing to generate)
+        self.got_ready_maze = False
+        self.future = MAZE_LOADER.submit(self.load, level, seed)
+
+    def load(self, level, seed):
+        """
+        Worker thread: gets / generates the maze and sets up the maze globals (set_up_maze).
+        :return: True, False if cancelled
+        """
+        maze = None
+        if seed is None:
+            maze = get_maze_prefetcher().get(level)
+            library = get_maze_library(level)
+            if maze is None and library:
+                maze = library.random_maze()
+            self.got_ready_maze = maze is not None
+        if maze is None:
+            self.builder = lv.start_level_maze(level, seed)
+            while not self.builder.run_for(LOAD_SLICE_MS):
+                if self.cancelled.is_set():
+                    return False
+            maze = self.builder.maze
+        if self.cancelled.is_set():
+            return False
+        set_up_maze(maze)
+        return True
+
+    @property
+    def progress(self):
+        """
+        :return: generated part of the maze, 0.0 to 1.0
+                 (0.0 before generation started, 1.0 once loaded or for a ready maze)
+        """
+        if self.got_ready_maze or self.future.done():
+            return 1.0
+        return self.builder.progress if self.builder else 0.0
+
+    def done(self):
+        return self.future.done()
+
+    def cancel(self):
+        """
+        Stops the loading (within a slice) and waits for the worker to let go of the maze globals.
+        """
+        self.cancelled.set()
+        if not self.future.cancel():
+            self.future.exception()
+
+
+def set_up_maze(maze):
+    """
+    Makes maze the maze of the game: sets the maze globals (sizes, end marker)
+    and adds its walls to WALLS.
+    """
+    global MAZE
+    MAZE = maze
+
+    # Maze setting
     global GRID_LENGTH
-    GRID_LENGTH = random.choice(LEVELS[level])  # *HAS TO BE a denominator of WINDOW_LENGTH!
+    GRID_LENGTH = MAZE.length  # *HAS TO BE a denominator of WINDOW_LENGTH!
     global SQ_LENGTH
     SQ_LENGTH = WINDOW_LENGTH / GRID_LENGTH
     global WALL_WIDTH
@@ -524,24 +662,83 @@ def play(level):
     # Container for collection of walls
     global WALLS
     WALLS = pygame.sprite.Group()
-    global MAZE
-    MAZE = mz.GridGraphMaze(length=GRID_LENGTH)
 
     # End marker rect
     global END_RECT
     END_RECT = get_end_node_marker_rect()
     ########################################
 
-    st_i, st_j = MAZE.start_coord
-    st_node = MAZE.grid[st_i][st_j]
+    # Draw maze
+    draw_maze(MAZE.grid)  # <= add all sprites (walls) to sprite group (WALLS)
+
+    # openings of every cell as drawn (taken directions + parent direction, entrance / exit included)
+    global CELL_OPENINGS
+    CELL_OPENINGS = bytes(((MAZE.open_dirs_grid & mz.DIRECTIONS_MASK) | PARENT_BITS[MAZE.parent_dirs_grid]).ravel())
 
-    length_of_path = random.randint(10, GRID_LENGTH * 2)  # 10  # int:[3,inf]
-    bud_count = random.randint(0, 4)  # int:[0:inf]
 
-    MAZE.make_maze(st_node, path_length=length_of_path, bud_node_cnt=bud_count)
+def draw_loading_window(progress, button):
+    """
+    Loading view shown while the maze is made: progress bar of the generated part.
+    """
+    WIN.blit(BACKGROUND2, (0, 0))
+    button.update(WIN)
+    text = get_font(20).render("loading", True, WALL_COLOR)
+    WIN.blit(text, text.get_rect(center=(WINDOW_LENGTH / 2, WINDOW_LENGTH / 2 - 30)))
+    bar = pygame.Rect(0, 0, WINDOW_LENGTH / 2, 16)
+    bar.center = (WINDOW_LENGTH / 2, WINDOW_LENGTH / 2 + 10)
+    pygame.draw.rect(WIN, WALL_COLOR, bar, 2)
+    WIN.fill(WALL_COLOR, (bar.x, bar.y, bar.width * progress, bar.height))
+    pygame.display.flip()
+
+
+def load_maze(level, seed=None):
+    """
+    Loads the maze of play() on the MAZE_LOADER thread (MazeLoader) and shows the loading
+    view until it is done. Back button / closing the window cancel the loading.
+    :return: None when loaded, True to go back to the menu, False to quit
+    """
+    clock = pygame.time.Clock()
+    loader = MazeLoader(level, seed)
+    back_to_menu_button = bn.Button(image=pygame.image.load("assets/yellow_arrow.png"), pos=(22, WINDOW_LENGTH+21),
+                                    text_input=" ", font=get_font(1), base_color="#d7fcd4", hovering_color="White")
+    while not loader.done():
+        clock.tick(FPS)
+        mouse_pos = pygame.mouse.get_pos()
+        back_to_menu_button.change_color(mouse_pos)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                loader.cancel()
+                return False
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if back_to_menu_button.check_for_input(mouse_pos):
+                    loader.cancel()
+                    return True
+
+        draw_loading_window(loader.progress, back_to_menu_button)
+    # re-raises errors of the worker
+    loader.future.result()
+    return None
 
-    # Draw maze
-    draw_maze(MAZE.grid)  # <= add all sprites (walls) to sprite group (WALLS)
+
+def play(level, seed=None):
+    """
+    Gets a maze of the given level and runs the game loop on it.
+    The maze is a ready one from the prefetcher when there is one (see MazeLoader),
+    the loading view is shown while it is made.
+    :param level: key of levels.LEVELS
+    :param seed: generate the maze from this seed instead; same seed => same maze
+    """
+    clock = pygame.time.Clock()
+
+    # Take ready maze / make maze (sets the maze globals)
+    back_or_quit = load_maze(level, seed)
+    if back_or_quit is not None:
+        return back_or_quit
+
+    # background + walls drawn once
+    global MAZE_LAYER
+    MAZE_LAYER = make_maze_layer()
 
     # player rect initial center coordinate
     init_x = MAZE.start_coord[1] * SQ_LENGTH + SQ_LENGTH / 2
@@ -550,16 +747,22 @@ def play(level):
 
     rotation_angle = 0
 
+    back_to_menu_button = bn.Button(image=pygame.image.load("assets/yellow_arrow.png"), pos=(22, WINDOW_LENGTH+21),
+                                    text_input=" ", font=get_font(1), base_color="#d7fcd4",
+                                    hovering_color="White")
+    # dirty rectangle state: whole window drawn on the first frame (and when the window was exposed)
+    full_redraw = True
+    last_player_rect = player.rect.copy()
+    hovering = False
+
     while True:
         # this controls the speed of while loop (cap=FPS)
         # FPS times / second
         clock.tick(FPS)
 
         mouse_pos = pygame.mouse.get_pos()
-        back_to_menu_button = bn.Button(image=pygame.image.load("assets/yellow_arrow.png"), pos=(22, WINDOW_LENGTH+21),
-                                        text_input=" ", font=get_font(1), base_color="#d7fcd4",
-                                        hovering_color="White")
         back_to_menu_button.change_color(mouse_pos)
+        was_hovering, hovering = hovering, back_to_menu_button.check_for_input(mouse_pos)
 
         # loop & check for all the events and execute based on events
         for event in pygame.event.get():
@@ -568,6 +771,8 @@ def play(level):
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if back_to_menu_button.check_for_input(mouse_pos):
                     return True
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                full_redraw = True
 
         if rotation_angle == 360:
             rotation_angle = 0
@@ -577,7 +782,13 @@ def play(level):
 
         player.move()
 
-        draw_window(player, END_RECT, back_to_menu_button)
+        if DIRTY_RECTS and not full_redraw:
+            last_player_rect = draw_window_dirty(player, END_RECT, back_to_menu_button, last_player_rect,
+                                                 hovering != was_hovering)
+        else:
+            draw_window(player, END_RECT, back_to_menu_button)
+            last_player_rect = player.rect.copy()
+            full_redraw = False
 
 
 def get_font(size):
@@ -586,6 +797,8 @@ def get_font(size):
 
 def main_menu():
     clock = pygame.time.Clock()
+    # start making mazes while the player is in the menu
+    get_maze_prefetcher()
     title = get_font(50).render("Zen Maze", True, "#b68f40")
     menu_rect = title.get_rect(center=(300, 200))
 
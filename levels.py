@@ -0,0 +1,44 @@
+import random
+import maze as mz
+
+
+# grid lengths of each level (*HAVE TO BE denominators of game.WINDOW_LENGTH!)
+LEVELS = {'easy': [10, 12], 'med': [25, 30], 'hard': [50, 60]}
+
+
+def start_level_maze(level, seed=None):
+    """
+    Sets up a maze of the given level for generation in steps (see maze.MazeBuilder).
+    Grid length, path length and bud count are drawn from a Random seeded with seed,
+    the maze itself gets a seed drawn from it as well; same seed => same maze.
+
+    :param level: key of LEVELS
+    :param seed: int seed or None (random)
+    :return: MazeBuilder of the maze (builder.maze is the maze)
+    """
+    level_rng = random.Random(seed)
+
+    grid_length = level_rng.choice(LEVELS[level])
+    maze = mz.GridGraphMaze(length=grid_length, seed=level_rng.getrandbits(63))
+
+    st_i, st_j = maze.start_coord
+    st_node = maze.grid[st_i][st_j]
+
+    length_of_path = level_rng.randint(10, grid_length * 2)  # 10  # int:[3,inf]
+    bud_count = level_rng.randint(0, 4)  # int:[0:inf]
+
+    return maze.start_maze(st_node, path_length=length_of_path, bud_node_cnt=bud_count)
+
+
+def make_level_maze(level, seed=None):
+    """
+    Generates a maze of the given level (start_level_maze run to the end).
+    Kept free of pygame so mazes can be made outside of the game (libraries, workers).
+
+    :param level: key of LEVELS
+    :param seed: int seed or None (random)
+    :return: GridGraphMaze after make_maze
+    """
+    builder = start_level_maze(level, seed)
+    builder.run()
+    return builder.maze
@@ -0,0 +1,108 @@
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import maze as mz
+import maze_library as ml
+
+
+# grid cells generated per worker task; small mazes go in chunks so that
+# process round trips don't eat the gain of running in parallel
+CHUNK_CELLS = 10000
+
+
+def make_seeded_maze(length, seed, path_length=None, bud_node_cnt=None, algorithm=mz.DEFAULT_ALGORITHM):
+    """
+    Generates one maze from its seed.
+    make_maze arguments that are not given are drawn from a Random seeded with seed,
+    the same way levels.make_level_maze draws them; same arguments => same maze.
+
+    :param length: grid length
+    :param seed: int seed of the maze
+    :param path_length: path_length of make_maze or None
+    :param bud_node_cnt: bud_node_cnt of make_maze or None
+    :param algorithm: generating algorithm (key of maze.MAZE_ALGORITHMS)
+    :return: GridGraphMaze after make_maze
+    """
+    param_rng = random.Random(seed)
+    if path_length is None:
+        path_length = param_rng.randint(10, length * 2)
+    if bud_node_cnt is None:
+        bud_node_cnt = param_rng.randint(0, 4)
+
+    maze = mz.GridGraphMaze(length=length, seed=seed, algorithm=algorithm)
+    st_i, st_j = maze.start_coord
+    maze.make_maze(maze.grid[st_i][st_j], path_length=path_length, bud_node_cnt=bud_node_cnt)
+    return maze
+
+
+def make_maze_record(length, seed, **params):
+    """
+    :return: GridGraphMaze.to_bytes() record of make_seeded_maze(length, seed, **params)
+    """
+    return make_seeded_maze(length, seed, **params).to_bytes()
+
+
+def check_maze_params(params):
+    """
+    :param params: dict of make_seeded_maze keyword arguments or None
+    :return: copy of params as dict
+    """
+    params = dict(params or {})
+    unknown = set(params) - {'path_length', 'bud_node_cnt', 'algorithm'}
+    if unknown:
+        raise ValueError("unknown maze parameters: %s" % ', '.join(sorted(unknown)))
+    return params
+
+
+def make_maze_records(jobs, params):
+    """
+    Worker task: generates a chunk of mazes.
+
+    :param jobs: list of (length, seed)
+    :param params: keyword arguments of make_maze_record
+    :return: list of (length, seed, record)
+    """
+    return [(length, seed, make_maze_record(length, seed, **params)) for length, seed in jobs]
+
+
+def generate_batch(sizes, count, params=None, workers=None, first_seed=0):
+    """
+    Generates count mazes of every grid length in sizes on a pool of worker processes.
+    Maze k of a size gets seed first_seed + k, so a batch can be made again (or in parts).
+    Mazes come back as to_bytes() records and are yielded as soon as their chunk is done,
+    i.e. not in order; write_maze_library takes the records as they are.
+
+    :param sizes: iterable of grid lengths
+    :param count: number of mazes of each size
+    :param params: dict with path_length, bud_node_cnt and/or algorithm (see make_seeded_maze)
+    :param workers: number of worker processes (None => number of cpus)
+    :param first_seed: seed of the first maze of each size
+    :return: generator of (length, seed, record)
+    """
+    params = check_maze_params(params)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = []
+        for length in sizes:
+            chunk_size = max(1, CHUNK_CELLS // (length * length))
+            for start in range(first_seed, first_seed + count, chunk_size):
+                stop = min(start + chunk_size, first_seed + count)
+                jobs = [(length, seed) for seed in range(start, stop)]
+                futures.append(executor.submit(make_maze_records, jobs, params))
+
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        # drop the chunks not started yet if the caller stops early
+        executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    # python maze_batch.py <library file> <count per size> <size> [size ...]
+    library_path = sys.argv[1]
+    n_mazes = int(sys.argv[2])
+    grid_lengths = [int(arg) for arg in sys.argv[3:]]
+    os.makedirs(os.path.dirname(library_path) or '.', exist_ok=True)
+    n_written = ml.write_maze_library(library_path, (record for _, _, record in generate_batch(grid_lengths, n_mazes)))
+    print("wrote %d mazes to %s" % (n_written, library_path))
@@ -0,0 +1,123 @@
+import mmap
+import os
+import random
+import struct
+import sys
+import numpy as np
+import maze as mz
+import levels as lv
+
+
+# maze library file:
+#   header: magic, version, number of mazes, offset of the index
+#   records: GridGraphMaze.to_bytes() of every maze, one after another
+#   index: (offset, size, grid length) of every record
+LIBRARY_MAGIC = b'ZMLB'
+LIBRARY_VERSION = 1
+LIBRARY_HEADER = struct.Struct('<4sB3xQQ')
+LIBRARY_INDEX_DTYPE = np.dtype([('offset', '<u8'), ('size', '<u4'), ('length', '<u4')])
+
+
+def write_maze_library(path, mazes):
+    """
+    Writes mazes into a single maze library file.
+    The index goes after the records, so mazes can be any iterable (e.g. a generator).
+
+    :param path: library file path
+    :param mazes: iterable of GridGraphMaze or of their to_bytes() records
+    :return: number of mazes written
+    """
+    entries = []
+    with open(path, 'wb') as f:
+        f.write(LIBRARY_HEADER.pack(LIBRARY_MAGIC, LIBRARY_VERSION, 0, 0))  # filled in at the end
+        for maze in mazes:
+            record = maze.to_bytes() if isinstance(maze, mz.GridGraphMaze) else bytes(maze)
+            length = mz.MAZE_HEADER.unpack_from(record)[4]
+            entries.append((f.tell(), len(record), length))
+            f.write(record)
+
+        index_offset = f.tell()
+        f.write(np.array(entries, dtype=LIBRARY_INDEX_DTYPE).tobytes())
+        f.seek(0)
+        f.write(LIBRARY_HEADER.pack(LIBRARY_MAGIC, LIBRARY_VERSION, len(entries), index_offset))
+    return len(entries)
+
+
+class MazeLibrary:
+    def __init__(self, path):
+        """
+        Read only view of a maze library file opened with mmap.
+        Only the header is parsed on open; the index is a numpy view of the file
+        and loading maze #n reads just the pages of that record.
+
+        :param path: library file written by write_maze_library
+        """
+        self.path = path
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, index_offset = LIBRARY_HEADER.unpack_from(self.mm)
+        if magic != LIBRARY_MAGIC:
+            self.close()
+            raise ValueError("not a maze library (magic %r)" % magic)
+        if version != LIBRARY_VERSION:
+            self.close()
+            raise ValueError("unsupported maze library version %d" % version)
+        self.index = np.frombuffer(self.mm, dtype=LIBRARY_INDEX_DTYPE, count=count, offset=index_offset)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record(self, n):
+        """
+        :return: to_bytes() record of maze #n as a memoryview into the file (no copy)
+        """
+        offset, size, _ = self.index[n]
+        return memoryview(self.mm)[int(offset):int(offset) + int(size)]
+
+    def load(self, n):
+        """
+        :return: GridGraphMaze #n of the library
+        """
+        record = self.record(n)
+        try:
+            return mz.GridGraphMaze.from_bytes(record)
+        finally:
+            record.release()
+
+    def random_maze(self, rng=random):
+        """
+        :param rng: random source to pick the maze with (random.Random like)
+        :return: uniformly picked GridGraphMaze of the library
+        """
+        return self.load(rng.randrange(len(self)))
+
+    def close(self):
+        # the index view holds a buffer of the mmap, drop it before closing
+        self.index = None
+        self.mm.close()
+        self.file.close()
+
+
+def build_level_libraries(directory, count, first_seed=0):
+    """
+    Writes <directory>/<level>.zmlb of count mazes for every level of LEVELS.
+    Maze k of a level is make_level_maze(level, seed=first_seed + k).
+    """
+    os.makedirs(directory, exist_ok=True)
+    for level in lv.LEVELS:
+        mazes = (lv.make_level_maze(level, seed=seed) for seed in range(first_seed, first_seed + count))
+        write_maze_library(os.path.join(directory, level + '.zmlb'), mazes)
+
+
+if __name__ == "__main__":
+    # python maze_library.py [count per level] [directory]
+    n_mazes = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    library_dir = sys.argv[2] if len(sys.argv) > 2 else 'mazes'
+    build_level_libraries(library_dir, n_mazes)
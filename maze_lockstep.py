@@ -0,0 +1,188 @@
+import sys
+import time
+import numpy as np
+import maze as mz
+
+
+# slot (DIRECTION_SLOTS order: 2, 4, 6, 8) of each direction, and back
+SLOT_DIRECTIONS = np.array([2, 4, 6, 8], dtype=np.int8)
+SLOT_BITS = np.array([mz.DIRECTION_BITS[direction] for direction in (2, 4, 6, 8)], dtype=np.uint8)
+# slot of the opposite direction of every slot
+OPPOSITE_SLOTS = np.array([mz.DIRECTION_SLOTS[mz.OPPOSITE_DIRECTION[direction]] for direction in (2, 4, 6, 8)],
+                          dtype=np.intp)
+# random draws of a step are in range(PICK_CHOICES), evenly split over 1 to 4 slots (lcm of 1..4)
+PICK_CHOICES = 12
+
+
+def make_pick_slots():
+    """
+    :return: (16 x PICK_CHOICES) array, PICK_SLOTS[mask, r] is slot number r % popcount(mask)
+             of the slots set in the 4 bit mask (0 for empty mask)
+    """
+    pick_slots = np.zeros((16, PICK_CHOICES), dtype=np.intp)
+    for mask in range(1, 16):
+        mask_slots = [slot for slot in range(4) if mask & SLOT_BITS[slot]]
+        for r in range(PICK_CHOICES):
+            pick_slots[mask, r] = mask_slots[r % len(mask_slots)]
+    return pick_slots
+
+
+PICK_SLOTS = make_pick_slots()
+
+
+class LockstepMazes:
+    def __init__(self, count, length, seed=None):
+        """
+        count mazes of the same grid length generated together, every step running on
+        the whole (count x length x length) stack at once with numpy instead of cell by cell.
+        Meant for many small mazes (e.g. easy level 10 x 10 / 12 x 12).
+
+        Every maze is a random walk with backtracking (the backtracker algorithm) from its
+        start node: each step goes to a random unvisited neighbor of the cell on top of the
+        stack or pops the stack. A walk pushes and pops every cell once, so all the mazes
+        take the same 2 * n_cells - 3 steps and none of them has to wait for another.
+        The end node is kept out of the walk and hung on a random neighbor afterwards,
+        so it stays a leaf as in make_maze.
+
+        The result is count independent perfect mazes in the GridGraphMaze cell format:
+            open_dirs: (count x length x length) uint8, directions taken + fin / deadend flags
+            parent_dirs: (count x length x length) int8, 0 at start node
+            start_coords, end_coords: (count x 2) arrays
+
+        :param count: number of mazes
+        :param length: grid length of every maze (>= 2)
+        :param seed: int seed, random.Random, numpy Generator or None (see maze.make_rng)
+        """
+        if length < 2:
+            raise ValueError("Choose maze size bigger than 2! (got %d)" % length)
+        self.count = count
+        self.length = length
+        self.rng, self.seed = mz.make_rng(seed)
+
+        self.tables = mz.grid_tables(length)
+        self.start_coords, self.end_coords = self.choose_start_end_coords()
+        start_cells = self.start_coords[:, 0] * length + self.start_coords[:, 1]
+        end_cells = self.end_coords[:, 0] * length + self.end_coords[:, 1]
+
+        links, parent_slots = self.walk(start_cells, end_cells)
+
+        # parent_slots: slot towards parent, -1 at start node
+        has_parent = parent_slots >= 0
+        parent_dirs = np.where(has_parent, SLOT_DIRECTIONS[np.maximum(parent_slots, 0)], 0).astype(np.int8)
+        # directions taken = links except the one towards the parent
+        parent_bits = np.where(has_parent, SLOT_BITS[np.maximum(parent_slots, 0)], 0).astype(np.uint8)
+        open_dirs = links & ~parent_bits
+        open_dirs[open_dirs == 0] = mz.DEADEND_BIT
+        open_dirs[np.arange(count), end_cells] = mz.FIN_BIT
+
+        self.open_dirs = open_dirs.reshape(count, length, length)
+        self.parent_dirs = parent_dirs.reshape(count, length, length)
+
+    def __len__(self):
+        return self.count
+
+    def choose_start_end_coords(self):
+        """
+        choose_start_end_coord for every maze at once.
+        :return: (start_coords, end_coords), (count x 2) int arrays
+        """
+        generator = self.rng.generator
+        length, count = self.length, self.count
+        half = length // 2
+        placement = generator.integers(0, 4, count)
+        low = generator.integers(0, max(half, 1), count)  # in range(length / 2)
+        high = generator.integers(half, length, count)  # in range(length / 2, length)
+        last = length - 1
+
+        start_i = np.choose(placement, [0, last, high, low])
+        start_j = np.choose(placement, [low, high, 0, last])
+        end_i = np.choose(placement, [last, 0, 0, last])
+        end_j = np.choose(placement, [last, 0, last, 0])
+        return np.stack((start_i, start_j), axis=1), np.stack((end_i, end_j), axis=1)
+
+    def walk(self, start_cells, end_cells):
+        """
+        Backtracker walk of all the mazes in lockstep.
+        Per maze arrays get one extra column (cell n_cells): off-grid neighbors point there,
+        it is always visited, and mazes that pop in a step write their unused updates to it.
+
+        :param start_cells: start node of every maze
+        :param end_cells: end node of every maze
+        :return: (links, parent_slots), (count x n_cells) uint8 bitmask of linked directions and
+                 slot towards the parent of every cell (-1 at start node)
+        """
+        generator = self.rng.generator
+        count, n_cells = self.count, self.length * self.length
+        mazes = np.arange(count)
+        neighbors = self.tables.neighbors_grid.astype(np.intp)
+        neighbors = np.where(neighbors < 0, n_cells, neighbors)
+
+        # row offsets of the flattened (count x n_cells + 1) arrays
+        rows = mazes * (n_cells + 1)
+        visited = np.zeros(count * (n_cells + 1), dtype=bool)
+        visited[rows + n_cells] = True
+        visited[rows + start_cells] = True
+        visited[rows + end_cells] = True
+        links = np.zeros(count * (n_cells + 1), dtype=np.uint8)
+        parent_slots = np.full(count * (n_cells + 1), -1, dtype=np.int8)
+        stack = np.empty((count, n_cells), dtype=np.intp)
+        stack[:, 0] = start_cells
+        depth = np.zeros(count, dtype=np.intp)
+
+        n_steps = 2 * n_cells - 3
+        draws = generator.integers(0, PICK_CHOICES, (n_steps, count), dtype=np.intp)
+        for step in range(n_steps):
+            cells = stack[mazes, depth]
+            cell_neighbors = neighbors[cells]  # count x 4
+            unvisited = ~visited[rows[:, np.newaxis] + cell_neighbors]
+            masks = unvisited @ SLOT_BITS
+            slots = PICK_SLOTS[masks, draws[step]]
+            goes = masks != 0
+            # children of the mazes that pop are the extra column
+            children = np.where(goes, cell_neighbors[mazes, slots], n_cells)
+            global_children = rows + children
+
+            links[np.where(goes, rows + cells, global_children)] |= SLOT_BITS[slots]
+            links[global_children] |= SLOT_BITS[OPPOSITE_SLOTS[slots]]
+            parent_slots[global_children] = OPPOSITE_SLOTS[slots]
+            visited[global_children] = True
+            depth += np.where(goes, 1, -1)
+            stack[mazes, np.maximum(depth, 0)] = np.where(goes, children, stack[mazes, np.maximum(depth, 0)])
+
+        links = links.reshape(count, n_cells + 1)[:, :n_cells]
+        parent_slots = parent_slots.reshape(count, n_cells + 1)[:, :n_cells]
+
+        # end node hangs on a random in-grid neighbor
+        accessible = np.frombuffer(self.tables.accessible_dirs, dtype=np.uint8)
+        end_slots = PICK_SLOTS[accessible[end_cells], generator.integers(0, PICK_CHOICES, count)]
+        end_neighbors = neighbors[end_cells, end_slots]
+        links[mazes, end_cells] |= SLOT_BITS[end_slots]
+        links[mazes, end_neighbors] |= SLOT_BITS[OPPOSITE_SLOTS[end_slots]]
+        parent_slots[mazes, end_cells] = end_slots
+        return links, parent_slots
+
+    def maze(self, k):
+        """
+        :return: maze k as a GridGraphMaze (cells copied)
+        """
+        return mz.GridGraphMaze.from_cell_arrays(self.open_dirs[k], self.parent_dirs[k],
+                                                 tuple(self.start_coords[k].tolist()),
+                                                 tuple(self.end_coords[k].tolist()))
+
+    def records(self):
+        """
+        :return: generator of the GridGraphMaze.to_bytes() record of every maze (without seed)
+        """
+        for k in range(self.count):
+            header = mz.MAZE_HEADER.pack(mz.MAZE_FORMAT_MAGIC, mz.MAZE_FORMAT_VERSION, 0, 0, self.length,
+                                         *self.start_coords[k].tolist(), *self.end_coords[k].tolist(), 0)
+            yield header + mz.pack_cells(self.open_dirs[k], self.parent_dirs[k])
+
+
+if __name__ == "__main__":
+    # python maze_lockstep.py [count] [grid length]
+    n_mazes = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    grid_length = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    t0 = time.time()
+    LockstepMazes(n_mazes, grid_length, seed=0)
+    print("%d mazes of %d by %d in %.2f seconds" % (n_mazes, grid_length, grid_length, time.time() - t0))
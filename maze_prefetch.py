@@ -0,0 +1,65 @@
+import queue
+import threading
+import levels as lv
+
+
+# number of ready mazes kept per level
+PREFETCH_DEPTH = 2
+
+
+class MazePrefetcher:
+    def __init__(self, make_maze=lv.make_level_maze, levels=lv.LEVELS, depth=PREFETCH_DEPTH):
+        """
+        Keeps a bounded queue of ready made mazes for every level,
+        filled by a background (daemon) thread. get() takes a maze out of the queue
+        and wakes the thread up to make a new one for the freed slot;
+        it never makes a maze itself (None when the queue has run dry).
+
+        :param make_maze: function level => maze, called on the background thread
+        :param levels: levels to keep mazes for
+        :param depth: number of ready mazes kept per level (>= 1)
+        """
+        if depth < 1:
+            raise ValueError("prefetch depth has to be at least 1, got %d" % depth)
+        self.make_maze = make_maze
+        self.depth = depth
+        self.queues = {level: queue.Queue(maxsize=depth) for level in levels}
+
+        self.wakeup = threading.Event()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.fill_queues, name="maze-prefetch", daemon=True)
+        self.thread.start()
+
+    def fill_queues(self):
+        """
+        Background loop: makes a maze for the level with the fewest ready mazes
+        until every queue is full, then sleeps until get() frees a slot.
+        """
+        while not self.stopped:
+            hungry = [level for level, q in self.queues.items() if not q.full()]
+            if not hungry:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+            level = min(hungry, key=lambda lvl: self.queues[lvl].qsize())
+            # only this thread puts, so the queue cannot fill up in between
+            self.queues[level].put(self.make_maze(level))
+
+    def get(self, level):
+        """
+        :return: ready maze of the level, None if the queue has run dry (never blocks)
+        """
+        try:
+            maze = self.queues[level].get_nowait()
+        except queue.Empty:
+            return None
+        self.wakeup.set()
+        return maze
+
+    def stop(self):
+        """
+        Stops the background thread after the maze it is making (if any).
+        """
+        self.stopped = True
+        self.wakeup.set()
+        self.thread.join()
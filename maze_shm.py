@@ -0,0 +1,207 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+import numpy as np
+import maze as mz
+import maze_batch as mb
+
+
+# colors (background, wall, start, end) and dtype of rasters drawn by workers
+RASTER_COLORS = (0, 1, 1, 1)
+RASTER_DTYPE = np.uint8
+# smallest slab handed out by SlabPool (slabs are powers of two from here)
+MIN_SLAB_SIZE = 1 << 16
+
+
+def raster_shape(length):
+    """
+    :return: shape of the drawing_board of a maze of the grid length (padding included)
+    """
+    side = length * mz.CELL_PIXELS + 2
+    return side, side
+
+
+def shared_maze_size(length, raster=False):
+    """
+    Slab layout of a maze: open_dirs (length x length uint8), parent_dirs (length x length int8),
+    then the raster (raster_shape, RASTER_DTYPE) if there is one.
+    :return: number of bytes of the layout
+    """
+    n_bytes = 2 * length * length
+    if raster:
+        n_bytes += int(np.prod(raster_shape(length))) * np.dtype(RASTER_DTYPE).itemsize
+    return n_bytes
+
+
+class SlabPool:
+    def __init__(self, min_slab_size=MIN_SLAB_SIZE):
+        """
+        Pool of reusable shared memory blocks (slabs). Sizes are rounded up to powers of two,
+        so a released slab serves any later request of the same size class
+        and no segment is made and unlinked per maze.
+        The pool owns all its slabs: close() unlinks them.
+
+        :param min_slab_size: smallest slab size in bytes
+        """
+        self.min_slab_size = min_slab_size
+        self.slabs = {}  # name => SharedMemory, every slab of the pool
+        self.slab_sizes = {}  # name => size class of the slab
+        self.free_slabs = {}  # size class => [SharedMemory]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def slab_size(self, n_bytes):
+        """
+        :return: size class (power of two) of a request of n_bytes
+        """
+        return max(self.min_slab_size, 1 << max(n_bytes - 1, 0).bit_length())
+
+    def acquire(self, n_bytes):
+        """
+        :return: free SharedMemory slab of at least n_bytes (made if there is none)
+        """
+        size = self.slab_size(n_bytes)
+        free = self.free_slabs.get(size)
+        if free:
+            return free.pop()
+        slab = shared_memory.SharedMemory(create=True, size=size)
+        self.slabs[slab.name] = slab
+        self.slab_sizes[slab.name] = size
+        return slab
+
+    def release(self, slab):
+        """
+        Gives the slab back to the pool for reuse.
+        """
+        self.free_slabs.setdefault(self.slab_sizes[slab.name], []).append(slab)
+
+    def close(self):
+        """
+        Closes and unlinks every slab. Views into the slabs have to be released first.
+        """
+        for slab in self.slabs.values():
+            slab.close()
+            slab.unlink()
+        self.slabs.clear()
+        self.slab_sizes.clear()
+        self.free_slabs.clear()
+
+
+def make_maze_in_slab(slab_name, length, seed, params, raster):
+    """
+    Worker task: generates a maze (make_seeded_maze) and writes its cell arrays,
+    and its raster if asked for, straight into the shared memory slab (see shared_maze_size).
+
+    :return: (length, seed, start_coord, end_coord)
+    """
+    slab = shared_memory.SharedMemory(name=slab_name)
+    try:
+        maze = mb.make_seeded_maze(length, seed, **params)
+        n_cells = length * length
+        if raster:
+            # draws the entrance into parent_dirs too, so cells are written after
+            maze.draw_maze(*RASTER_COLORS)
+            board = np.ndarray(raster_shape(length), dtype=RASTER_DTYPE, buffer=slab.buf, offset=2 * n_cells)
+            board[:] = maze.drawing_board
+            del board
+        slab.buf[:n_cells] = maze.open_dirs
+        slab.buf[n_cells:2 * n_cells] = maze.parent_dirs
+        return length, seed, maze.start_coord, maze.end_coord
+    finally:
+        slab.close()
+
+
+class SharedMaze:
+    def __init__(self, pool, slab, length, seed, start_coord, end_coord, raster):
+        """
+        Maze made by a worker, read in place from its shared memory slab.
+        open_dirs, parent_dirs ((length x length)) and drawing_board (None without raster)
+        are numpy views of the slab; release() gives the slab back to the pool,
+        after which the views are gone.
+        """
+        self.pool = pool
+        self.slab = slab
+        self.length = length
+        self.seed = seed
+        self.start_coord = start_coord
+        self.end_coord = end_coord
+
+        n_cells = length * length
+        self.open_dirs = np.ndarray((length, length), dtype=np.uint8, buffer=slab.buf)
+        self.parent_dirs = np.ndarray((length, length), dtype=np.int8, buffer=slab.buf, offset=n_cells)
+        self.drawing_board = None
+        if raster:
+            self.drawing_board = np.ndarray(raster_shape(length), dtype=RASTER_DTYPE, buffer=slab.buf,
+                                            offset=2 * n_cells)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def to_maze(self):
+        """
+        :return: GridGraphMaze with a copy of the cells (stays valid after release)
+        """
+        return mz.GridGraphMaze.from_cell_arrays(self.open_dirs, self.parent_dirs, self.start_coord,
+                                                 self.end_coord, seed=self.seed)
+
+    def release(self):
+        if self.slab is None:
+            return
+        self.open_dirs = self.parent_dirs = self.drawing_board = None
+        self.pool.release(self.slab)
+        self.slab = None
+
+
+def generate_batch_shared(pool, sizes, count, params=None, workers=None, first_seed=0, raster=False):
+    """
+    Like maze_batch.generate_batch, but meant for big mazes: one maze per worker task,
+    and workers write the cells (and raster) into slabs of pool instead of sending them back,
+    so nothing big is pickled. Yielded SharedMaze have to be released to give their slab back;
+    at most 2 * workers mazes are in the making at a time.
+
+    :param pool: SlabPool the slabs come from (the caller closes it)
+    :param sizes: iterable of grid lengths
+    :param count: number of mazes of each size
+    :param params: dict with path_length, bud_node_cnt and/or algorithm (see make_seeded_maze)
+    :param workers: number of worker processes (None => number of cpus)
+    :param first_seed: seed of the first maze of each size
+    :param raster: also draw the maze (draw_maze with RASTER_COLORS) into the slab
+    :return: generator of SharedMaze, in order of completion
+    """
+    params = mb.check_maze_params(params)
+    max_pending = 2 * (workers or os.cpu_count() or 1)
+    jobs = ((length, seed) for length in sizes for seed in range(first_seed, first_seed + count))
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending = {}  # future => slab
+    try:
+        while True:
+            for length, seed in jobs:
+                slab = pool.acquire(shared_maze_size(length, raster))
+                pending[executor.submit(make_maze_in_slab, slab.name, length, seed, params, raster)] = slab
+                if len(pending) == max_pending:
+                    break
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                slab = pending.pop(future)
+                try:
+                    result = future.result()
+                except BaseException:
+                    pool.release(slab)
+                    raise
+                yield SharedMaze(pool, slab, *result, raster)
+    finally:
+        # drop the mazes not started yet if the caller stops early
+        executor.shutdown(cancel_futures=True)
+        for slab in pending.values():
+            pool.release(slab)
@@ -0,0 +1,409 @@
+import math
+import struct
+import sys
+import time
+import numpy as np
+import maze as mz
+
+
+# header of mazes that are not square (streamed only, GridGraphMaze can't load them):
+# MAZE_HEADER fields (length = width) + height
+STREAM_FORMAT_VERSION = 2
+STREAM_HEADER = struct.Struct('<4sBBBxIIIIIQI')
+# chance that a cell joins the run of the cell on its left
+JOIN_CHANCE = 0.5
+# chance that a cell of an Eller row goes down (besides the one passage down every set gets)
+DOWN_CHANCE = 0.3
+# direction of a single direction bit (parent direction of a cell in EllerMaze.drawing_rows)
+BIT_DIRECTIONS = np.zeros(16, dtype=np.int8)
+BIT_DIRECTIONS[[mz.DIRECTION_BITS[direction] for direction in (2, 4, 6, 8)]] = (2, 4, 6, 8)
+
+
+class SidewinderMaze:
+    def __init__(self, width, height=None, seed=None, join_chance=JOIN_CHANCE):
+        """
+        Maze generated one row at a time, top to bottom, keeping O(width) state,
+        so mazes far taller than memory can be written to a file or drawn as they are made.
+
+        Sidewinder algorithm (upside down): the cells of a row are cut into runs of
+        horizontally joined cells, every run gets exactly one passage down, and the last row
+        is one open corridor over the full width. With one way down per run, the way from
+        any cell to the last row is known once its row is done, so cells get the same
+        parent_dirs / open_dirs (with fin / deadend flags) as in GridGraphMaze right away
+        (sets going down more than once, as in EllerMaze, would leave parent
+        directions open until later rows).
+        The start node (root) is in the last row and the end node is the (0, 0) corner,
+        which is the "start at the bottom side, end at the top left corner" placement of
+        choose_start_end_coord.
+        Sidewinder mazes are biased: the way from the end node to the start node never goes up,
+        it only runs sideways within a run and down, and the last row has no walls inside.
+        Square streamed mazes are saved in the GridGraphMaze format (from_file loads them);
+        for drawings only, EllerMaze makes unbiased mazes.
+
+        :param width: number of cells of a row (>= 2)
+        :param height: number of rows (>= 2), None => width
+        :param seed: int seed, random.Random, numpy Generator or None (see maze.make_rng)
+        :param join_chance: chance of joining neighbor cells of a row; higher => longer corridors
+        """
+        height = width if height is None else height
+        if width < 2 or height < 2:
+            raise ValueError("Choose maze size bigger than 2! (got %d x %d)" % (height, width))
+        self.width = width
+        self.height = height
+        self.join_chance = join_chance
+        self.rng, self.seed = mz.make_rng(seed)
+
+        self.start_coord = (height - 1, self.rng.pick(range(width // 2, width)))
+        self.end_coord = (0, 0)
+        # rows() and the drawing start over from these on every call: same seed => same maze
+        self.rows_seed = self.rng.getrandbits(63)
+        self.draw_seed = self.rng.getrandbits(63)
+
+    def rows(self):
+        """
+        Generates the maze, the same one on every call.
+        :return: generator of (open_dirs, parent_dirs) of every row (uint8 / int8 arrays of width)
+        """
+        generator = np.random.default_rng(self.rows_seed)
+        width = self.width
+        columns = np.arange(width)
+        up_children = np.zeros(width, dtype=bool)
+
+        for i in range(self.height):
+            if i < self.height - 1:
+                joins = generator.random(width - 1) < self.join_chance
+                run_starts = np.flatnonzero(np.r_[True, ~joins])
+            else:
+                # last row is one run (open corridor) going to the start node
+                run_starts = np.zeros(1, dtype=np.int64)
+            run_ends = np.r_[run_starts[1:], width] - 1
+            run_lengths = run_ends - run_starts + 1
+
+            if i < self.height - 1:
+                down_cells = run_starts + (generator.random(len(run_starts)) * run_lengths).astype(np.int64)
+                if i == 0 and run_lengths[0] > 1:
+                    # end node has to stay a leaf: its run does not go down through it
+                    down_cells[0] = 1 + int(generator.random() * (run_lengths[0] - 1))
+            else:
+                down_cells = np.array([self.start_coord[1]])
+
+            run_of_cell = np.repeat(np.arange(len(run_starts)), run_lengths)
+            down, first, last = down_cells[run_of_cell], run_starts[run_of_cell], run_ends[run_of_cell]
+
+            # cells point along their run towards its down cell, the down cell points down
+            parent_dirs = np.where(columns < down, 6, np.where(columns > down, 4, 2)).astype(np.int8)
+            open_dirs = (np.where((columns > first) & (columns <= down), mz.DIRECTION_BITS[4], 0) |
+                         np.where((columns >= down) & (columns < last), mz.DIRECTION_BITS[6], 0) |
+                         np.where(up_children, mz.DIRECTION_BITS[8], 0)).astype(np.uint8)
+            open_dirs[open_dirs == 0] = mz.DEADEND_BIT
+            if i == 0:
+                open_dirs[0] = mz.FIN_BIT
+            if i == self.height - 1:
+                parent_dirs[self.start_coord[1]] = 0
+
+            yield open_dirs, parent_dirs
+            up_children = np.zeros(width, dtype=bool)
+            up_children[down_cells] = True
+
+    def header(self):
+        """
+        :return: MAZE_HEADER (square maze) or STREAM_HEADER bytes of the maze
+        """
+        flags = mz.HAS_SEED_FLAG if self.seed is not None else 0
+        fields = (mz.MAZE_FORMAT_MAGIC, mz.MAZE_FORMAT_VERSION, flags, 0, self.width,
+                  *self.start_coord, *self.end_coord, self.seed if self.seed is not None else 0)
+        if self.width == self.height:
+            return mz.MAZE_HEADER.pack(*fields)
+        return STREAM_HEADER.pack(fields[0], STREAM_FORMAT_VERSION, *fields[2:], self.height)
+
+    def to_file(self, path):
+        """
+        Generates the maze straight into a file of the compact format (header + pack_cells),
+        a few rows at a time.
+        """
+        with open(path, 'wb') as f:
+            f.write(self.header())
+            # pack_cells packs 4 cells into 3 bytes, cells of an unfinished group wait for the next row
+            left_open_dirs = np.zeros(0, dtype=np.uint8)
+            left_parent_dirs = np.zeros(0, dtype=np.int8)
+            for open_dirs, parent_dirs in self.rows():
+                open_dirs = np.concatenate((left_open_dirs, open_dirs))
+                parent_dirs = np.concatenate((left_parent_dirs, parent_dirs))
+                n_packed = len(open_dirs) // 4 * 4
+                f.write(mz.pack_cells(open_dirs[:n_packed], parent_dirs[:n_packed]))
+                left_open_dirs, left_parent_dirs = open_dirs[n_packed:], parent_dirs[n_packed:]
+            if len(left_open_dirs):
+                f.write(mz.pack_cells(left_open_dirs, left_parent_dirs))
+
+    def draw_maze_to_file(self, path, background_c_val, wall_c_val, start_c_val, end_c_val):
+        """
+        Generates and draws the maze straight into a .npy file (numpy memmap),
+        the same drawing as GridGraphMaze.draw_maze.
+        :return: shape of the drawing
+        """
+        return draw_rows_to_file(path, self.rows(), self.width, self.height, self.start_coord, self.end_coord,
+                                 mz.make_rng(self.draw_seed)[0], (background_c_val, wall_c_val, start_c_val, end_c_val))
+
+
+class EllerMaze:
+    def __init__(self, width, height=None, seed=None, join_chance=JOIN_CHANCE, down_chance=DOWN_CHANCE):
+        """
+        Maze generated one row at a time with Eller's algorithm, keeping O(width) state,
+        for drawings of mazes far taller than memory (draw_maze_to_file).
+
+        Every cell of a row is in a set of cells already connected (through this or earlier rows).
+        Neighbor cells of different sets are joined at random, then every set goes down at least once,
+        sometimes more; the last row joins all sets left. Unlike SidewinderMaze the paths go up
+        as well as down and the last row has walls like any other row.
+        Because a set can go down more than once, which way a cell's path leads to the start node
+        is only known once later rows are made, so Eller mazes have no parent directions and
+        can't be saved in the maze format (to_file); their rows are the passages of the cells.
+        The start node is in the last row and the end node is the (0, 0) corner, which
+        stays a leaf, as in SidewinderMaze.
+
+        :param width: number of cells of a row (>= 2)
+        :param height: number of rows (>= 2), None => width
+        :param seed: int seed, random.Random, numpy Generator or None (see maze.make_rng)
+        :param join_chance: chance of joining neighbor cells of different sets; higher => longer corridors
+        :param down_chance: chance of a cell going down besides the one passage down of its set
+        """
+        height = width if height is None else height
+        if width < 2 or height < 2:
+            raise ValueError("Choose maze size bigger than 2! (got %d x %d)" % (height, width))
+        self.width = width
+        self.height = height
+        self.join_chance = join_chance
+        self.down_chance = down_chance
+        self.rng, self.seed = mz.make_rng(seed)
+
+        self.start_coord = (height - 1, self.rng.pick(range(width // 2, width)))
+        self.end_coord = (0, 0)
+        # link_rows() and the drawing start over from these on every call: same seed => same maze
+        self.rows_seed = self.rng.getrandbits(63)
+        self.draw_seed = self.rng.getrandbits(63)
+
+    def link_rows(self):
+        """
+        Generates the maze, the same one on every call.
+        :return: generator of the passages of every row: uint8 array of width,
+                 DIRECTION_BITS of every direction open from the cell
+        """
+        generator = np.random.default_rng(self.rows_seed)
+        width = self.width
+        bits = mz.DIRECTION_BITS
+        # set of every cell of the row, cells that go down keep their set in the next row
+        sets = np.arange(width)
+        up_links = np.zeros(width, dtype=bool)
+        # union find over the sets of the current row
+        set_parents = []
+
+        def find(x):
+            while set_parents[x] != x:
+                set_parents[x] = set_parents[set_parents[x]]
+                x = set_parents[x]
+            return x
+
+        for i in range(self.height):
+            last_row = i == self.height - 1
+            # cells not entered from above start sets of their own; sets renumbered 0 .. n_sets - 1
+            sets = np.where(up_links, sets, width + np.arange(width))
+            _, sets = np.unique(sets, return_inverse=True)
+            set_parents[:] = range(int(sets.max()) + 1)
+
+            # join neighbor cells of different sets (all of them in the last row)
+            if last_row:
+                join_columns = range(width - 1)
+            else:
+                join_columns = np.flatnonzero(generator.random(width - 1) < self.join_chance).tolist()
+            row_sets = sets.tolist()
+            joins = np.zeros(width - 1, dtype=bool)
+            for j in join_columns:
+                a, b = find(row_sets[j]), find(row_sets[j + 1])
+                if a != b:
+                    set_parents[b] = a
+                    joins[j] = True
+            sets = np.array([find(x) for x in row_sets])
+
+            down_links = np.zeros(width, dtype=bool)
+            if not last_row:
+                down_links = generator.random(width) < self.down_chance
+                # every set goes down at least once: through its cell of highest priority
+                priorities = generator.random(width)
+                if i == 0 and joins[0]:
+                    # end node has to stay a leaf: joined to the right, it does not go down
+                    down_links[0] = False
+                    priorities[0] = -1
+                order = np.lexsort((priorities, sets))
+                set_last = np.flatnonzero(np.r_[sets[order][1:] != sets[order][:-1], True])
+                best_cells = order[set_last]
+                has_down = np.zeros(len(set_parents), dtype=bool)
+                has_down[sets[down_links]] = True
+                down_links[best_cells[~has_down[sets[best_cells]]]] = True
+
+            links = np.where(up_links, bits[8], 0) | np.where(down_links, bits[2], 0)
+            links[:-1] |= np.where(joins, bits[6], 0)
+            links[1:] |= np.where(joins, bits[4], 0)
+            yield links.astype(np.uint8)
+            up_links = down_links
+
+    def drawing_rows(self):
+        """
+        link_rows as (open_dirs, parent_dirs) rows draw_rows can draw: every cell but the start node
+        gets one of its passages as parent direction, so the cells are drawn with all their passages
+        (the parent directions do not lead to the start node).
+        :return: generator of (open_dirs, parent_dirs) of every row (uint8 / int8 arrays of width)
+        """
+        start_i, start_j = self.start_coord
+        for i, links in enumerate(self.link_rows()):
+            parent_dirs = BIT_DIRECTIONS[links & -links]
+            open_dirs = links & ~(links & -links)
+            open_dirs[open_dirs == 0] = mz.DEADEND_BIT
+            if i == 0:
+                open_dirs[0] = mz.FIN_BIT
+            if i == start_i:
+                # start node: all passages open, draw_rows picks its entrance
+                parent_dirs[start_j] = 0
+                open_dirs[start_j] = links[start_j]
+            yield open_dirs, parent_dirs
+
+    def draw_maze_to_file(self, path, background_c_val, wall_c_val, start_c_val, end_c_val):
+        """
+        Generates and draws the maze straight into a .npy file (numpy memmap),
+        drawn like GridGraphMaze.draw_maze.
+        :return: shape of the drawing
+        """
+        return draw_rows_to_file(path, self.drawing_rows(), self.width, self.height, self.start_coord,
+                                 self.end_coord, mz.make_rng(self.draw_seed)[0],
+                                 (background_c_val, wall_c_val, start_c_val, end_c_val))
+
+
+def read_file_rows(path):
+    """
+    Reads a maze file (GridGraphMaze.to_file or SidewinderMaze.to_file) a few rows at a time.
+    :return: (width, height, start_coord, end_coord, generator of (open_dirs, parent_dirs) of every row)
+    """
+    with open(path, 'rb') as f:
+        head = f.read(STREAM_HEADER.size)
+    magic, version = head[:4], head[4]
+    if magic != mz.MAZE_FORMAT_MAGIC:
+        raise ValueError("not a maze file (magic %r)" % magic)
+    if version == mz.MAZE_FORMAT_VERSION:
+        _, _, _, start_parent, width, start_i, start_j, end_i, end_j, _ = mz.MAZE_HEADER.unpack_from(head)
+        height = width
+        header_size = mz.MAZE_HEADER.size
+    elif version == STREAM_FORMAT_VERSION:
+        _, _, _, start_parent, width, start_i, start_j, end_i, end_j, _, height = STREAM_HEADER.unpack(head)
+        header_size = STREAM_HEADER.size
+    else:
+        raise ValueError("unsupported maze format version %d" % version)
+
+    def rows():
+        # the file is opened again for the rows: closed when the generator ends or is closed
+        with open(path, 'rb') as f:
+            f.seek(header_size)
+            # smallest number of rows that fills whole bytes
+            group_rows = 4 // math.gcd(width, 4)
+            for top in range(0, height, group_rows):
+                n_rows = min(group_rows, height - top)
+                n_cells = n_rows * width
+                open_bits, parent_dirs = mz.unpack_cells(f.read((6 * n_cells + 7) // 8), n_cells)
+                open_bits[open_bits == 0] = mz.DEADEND_BIT
+                for k in range(n_rows):
+                    i = top + k
+                    row_open_dirs = open_bits[k * width:(k + 1) * width]
+                    row_parent_dirs = parent_dirs[k * width:(k + 1) * width].astype(np.int8)
+                    if i == end_i and row_open_dirs[end_j] == mz.DEADEND_BIT:
+                        row_open_dirs[end_j] = mz.FIN_BIT
+                    if i == start_i:
+                        row_parent_dirs[start_j] = start_parent
+                    yield row_open_dirs, row_parent_dirs
+
+    return width, height, (start_i, start_j), (end_i, end_j), rows()
+
+
+def draw_rows(rows, width, height, start_coord, end_coord, rng, colors):
+    """
+    Draws maze rows as they come (see GridGraphMaze.draw_maze for the drawing).
+    The entrance is picked like decide_entrance_direction_of_maze_from_start_node
+    unless the start node already has a parent direction.
+
+    :param rows: iterable of (open_dirs, parent_dirs) of every row
+    :param rng: random source picking the entrance
+    :param colors: (background, wall, start, end) color values
+    :return: generator of pixel row blocks: padding row + first block,
+             CELL_PIXELS rows for every other row, last block + padding row
+    """
+    background_c_val, wall_c_val, start_c_val, end_c_val = colors
+    cell_pixels = mz.CELL_PIXELS
+    start_i, start_j = start_coord
+
+    for i, (open_dirs, parent_dirs) in enumerate(rows):
+        entrance = 0
+        if i == start_i:
+            parent_dirs = parent_dirs.copy()
+            entrance = parent_dirs[start_j]
+            if not entrance:
+                entrance_directions = [2] if i == height - 1 else [8] if i == 0 else []
+                if start_j == 0:
+                    entrance_directions.append(4)
+                if start_j == width - 1:
+                    entrance_directions.append(6)
+                entrance = rng.pick(entrance_directions)
+                parent_dirs[start_j] = entrance
+
+        pattern_ids = mz.classify_cells(parent_dirs[np.newaxis, :], open_dirs[np.newaxis, :])
+        invalid_columns = np.flatnonzero(pattern_ids[0] == 0)
+        if len(invalid_columns):
+            print("while drawing error occurred @ row %d, columns %s" % (i, invalid_columns.tolist()))
+        block = np.where(mz.rasterize_patterns(pattern_ids), wall_c_val, background_c_val)
+        for (mark_i, mark_j), c_val in ((start_coord, start_c_val), (end_coord, end_c_val)):
+            if mark_i == i:
+                block[2:cell_pixels - 2, mark_j * cell_pixels + 2:(mark_j + 1) * cell_pixels - 2] = c_val
+        block = np.pad(block, ((0, 0), (1, 1)), mode='constant', constant_values=wall_c_val)
+
+        # open the padding next to the start node, keeping the corner pixels of the cell
+        x_start = start_j * cell_pixels + 1
+        if entrance == 4:
+            block[1:cell_pixels - 1, x_start - 1] = background_c_val
+        elif entrance == 6:
+            block[1:cell_pixels - 1, x_start + cell_pixels] = background_c_val
+
+        pad_row = np.full((1, block.shape[1]), wall_c_val, dtype=block.dtype)
+        if i == 0:
+            if entrance == 8:
+                pad_row[0, x_start + 1:x_start + cell_pixels - 1] = background_c_val
+            block = np.concatenate((pad_row, block))
+        if i == height - 1:
+            pad_row = np.full((1, block.shape[1]), wall_c_val, dtype=block.dtype)
+            if entrance == 2:
+                pad_row[0, x_start + 1:x_start + cell_pixels - 1] = background_c_val
+            block = np.concatenate((block, pad_row))
+        yield block
+
+
+def draw_rows_to_file(path, rows, width, height, start_coord, end_coord, rng, colors, dtype=np.uint8):
+    """
+    Writes draw_rows into a .npy file through a numpy memmap, one block at a time.
+    :return: shape of the drawing
+    """
+    shape = (height * mz.CELL_PIXELS + 2, width * mz.CELL_PIXELS + 2)
+    board = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    top = 0
+    for block in draw_rows(rows, width, height, start_coord, end_coord, rng, colors):
+        board[top:top + len(block)] = block
+        top += len(block)
+        board.flush()
+    del board
+    return shape
+
+
+if __name__ == "__main__":
+    # python maze_stream.py <width> <height> <maze file> [drawing .npy file]
+    maze_width, maze_height, maze_path = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+    t0 = time.time()
+    SidewinderMaze(maze_width, maze_height, seed=0).to_file(maze_path)
+    print("%d by %d maze in %.1f seconds" % (maze_height, maze_width, time.time() - t0))
+    if len(sys.argv) > 4:
+        stream_width, stream_height, start, end, file_rows = read_file_rows(maze_path)
+        draw_rows_to_file(sys.argv[4], file_rows, stream_width, stream_height, start, end, mz.make_rng(0)[0],
+                          (0, 1, 1, 1))
@@ -0,0 +1,179 @@
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import maze as mz
+import maze_batch as mb
+
+
+# smallest tile default_tile_length picks
+MIN_TILE_LENGTH = 16
+# default_tile_length aims at this many tiles per worker (evens out slow and fast tiles)
+TILES_PER_WORKER = 4
+
+
+def tile_directions(tile, n_tiles):
+    """
+    :return: directions from tile towards the tiles next to it
+    """
+    ti, tj = tile
+    return [direction for direction, (di, dj) in mz.DIRECTION_STEPS.items()
+            if 0 <= ti + di < n_tiles and 0 <= tj + dj < n_tiles]
+
+
+def default_tile_length(length, workers):
+    """
+    :return: largest divisor of length (>= MIN_TILE_LENGTH) giving every worker
+             about TILES_PER_WORKER tiles; length itself (one tile) if there is none
+    """
+    target = length / math.sqrt(TILES_PER_WORKER * workers)
+    divisors = [t for t in range(MIN_TILE_LENGTH, int(target) + 1) if length % t == 0]
+    return max(divisors) if divisors else length
+
+
+def make_tile_cells(tile_length, seed, start_coord, end_coord, path_length, bud_node_cnt, algorithm):
+    """
+    Worker task: generates one tile as a maze of its own.
+
+    :param tile_length: grid length of the tile
+    :param seed: int seed of the tile
+    :param start_coord: (i, j) in the tile where generation starts (root of the tile's tree)
+    :param end_coord: (i, j) in the tile of the maze's end node, None if the tile has no end node
+    :param path_length: path_length of make_maze
+    :param bud_node_cnt: bud_node_cnt of make_maze
+    :param algorithm: generating algorithm of the tile (key of maze.MAZE_ALGORITHMS)
+    :return: (open_dirs, parent_dirs) of the tile as bytes
+    """
+    tile = mz.GridGraphMaze(length=tile_length, seed=seed, algorithm=algorithm)
+    tile.start_coord = start_coord
+    tile.start_cell = start_coord[0] * tile_length + start_coord[1]
+    tile.end_coord = end_coord
+    # -1 matches no cell: every leaf of the tile becomes a deadend
+    tile.end_cell = -1 if end_coord is None else end_coord[0] * tile_length + end_coord[1]
+
+    st_i, st_j = start_coord
+    tile.make_maze(tile.grid[st_i][st_j], path_length=path_length, bud_node_cnt=bud_node_cnt)
+    return bytes(tile.open_dirs), bytes(tile.parent_dirs)
+
+
+def make_tile_tree(n_tiles, root, rng):
+    """
+    Random spanning tree of the n_tiles x n_tiles grid of tiles (randomized Prim).
+    :param root: (ti, tj) of the root tile
+    :return: dict child tile => direction from child tile towards its parent tile
+    """
+    parent_of = {}
+    in_tree = {root}
+    edges = [(root, direction) for direction in tile_directions(root, n_tiles)]
+    while edges:
+        k = rng.randbelow(len(edges))
+        edges[k], edges[-1] = edges[-1], edges[k]
+        (ti, tj), direction = edges.pop()
+        di, dj = mz.DIRECTION_STEPS[direction]
+        child = (ti + di, tj + dj)
+        if child in in_tree:
+            continue
+        in_tree.add(child)
+        parent_of[child] = mz.OPPOSITE_DIRECTION[direction]
+        edges.extend((child, child_direction) for child_direction in tile_directions(child, n_tiles))
+    return parent_of
+
+
+def make_tiled_maze(length, seed=None, tile_length=None, params=None, workers=None):
+    """
+    Generates one big maze in parallel: the grid is cut into square tiles, every tile is
+    generated as a maze of its own on a worker process, then neighboring tiles of a random
+    spanning tree of tiles are joined with exactly one passage each. The result is still
+    one tree over all cells (exactly one path between any two cells).
+    Start and end nodes are placed by choose_start_end_coord of the whole grid: the tile
+    of the start node is generated from the start node and the end node stays a leaf (fin),
+    every other tile is generated from the cell its passage to the parent tile enters at,
+    so parent directions point towards the start node as in a maze made by make_maze.
+    Tile borders only have one opening per tile neighbor, so smaller tiles show more straight walls.
+
+    :param length: grid length of the maze
+    :param seed: seed of the maze (see GridGraphMaze), the same seed and tiling give the same maze
+    :param tile_length: side of a tile, has to divide length (None => default_tile_length)
+    :param params: dict with path_length, bud_node_cnt and/or algorithm used for each tile
+                   (path_length / bud_node_cnt not given => drawn per tile like make_seeded_maze)
+    :param workers: number of worker processes (None => number of cpus)
+    :return: finished GridGraphMaze
+    """
+    params = mb.check_maze_params(params)
+    workers = workers or os.cpu_count() or 1
+    if tile_length is None:
+        tile_length = default_tile_length(length, workers)
+    if tile_length < 2 or length % tile_length:
+        raise ValueError("tile length %d does not divide grid length %d" % (tile_length, length))
+
+    # only the random source and start/end of the whole maze are made here, no cell state
+    rng, seed = mz.make_rng(seed)
+    start_coord, end_coord = mz.choose_start_end_coord(length, rng)
+    n_tiles = length // tile_length
+    start_tile = (start_coord[0] // tile_length, start_coord[1] // tile_length)
+    end_tile = (end_coord[0] // tile_length, end_coord[1] // tile_length)
+
+    # one passage per tree edge: entry cell of the child tile (local) and parent side cell (global)
+    entries = {start_tile: (start_coord[0] % tile_length, start_coord[1] % tile_length)}
+    passages = []  # (child side cell, parent side cell, direction child => parent)
+    for tile, direction in sorted(make_tile_tree(n_tiles, start_tile, rng).items()):
+        # border cells of the child tile facing the parent tile (global coordinates)
+        top, left = tile[0] * tile_length, tile[1] * tile_length
+        if direction == 2:
+            border = [(top + tile_length - 1, left + k) for k in range(tile_length)]
+        elif direction == 8:
+            border = [(top, left + k) for k in range(tile_length)]
+        elif direction == 4:
+            border = [(top + k, left) for k in range(tile_length)]
+        else:
+            border = [(top + k, left + tile_length - 1) for k in range(tile_length)]
+
+        di, dj = mz.DIRECTION_STEPS[direction]
+        # the end node has to stay a leaf: no passage through it
+        border = [(i, j) for i, j in border if end_coord not in ((i, j), (i + di, j + dj))]
+        i, j = rng.pick(border)
+        entries[tile] = (i - top, j - left)
+        passages.append(((i, j), (i + di, j + dj), direction))
+
+    jobs = {}
+    for tile, entry in sorted(entries.items()):
+        tile_end_coord = None
+        if tile == end_tile:
+            tile_end_coord = (end_coord[0] % tile_length, end_coord[1] % tile_length)
+        path_length = params.get('path_length', rng.randint(10, tile_length * 2))
+        bud_node_cnt = params.get('bud_node_cnt', rng.randint(0, 4))
+        jobs[tile] = (tile_length, rng.getrandbits(63), entry, tile_end_coord, path_length, bud_node_cnt,
+                      params.get('algorithm', mz.DEFAULT_ALGORITHM))
+
+    open_dirs = np.empty((length, length), dtype=np.uint8)
+    parent_dirs = np.empty((length, length), dtype=np.int8)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(make_tile_cells, *job): tile for tile, job in jobs.items()}
+        for future in as_completed(futures):
+            ti, tj = futures[future]
+            tile_open_dirs, tile_parent_dirs = future.result()
+            rows = slice(ti * tile_length, (ti + 1) * tile_length)
+            cols = slice(tj * tile_length, (tj + 1) * tile_length)
+            open_dirs[rows, cols] = np.frombuffer(tile_open_dirs, dtype=np.uint8).reshape(tile_length, tile_length)
+            parent_dirs[rows, cols] = np.frombuffer(tile_parent_dirs, dtype=np.int8).reshape(tile_length, tile_length)
+
+    # join the tiles: the entry cell (root of its tile) becomes a child of the parent side cell
+    for child, parent, direction in passages:
+        parent_dirs[child] = direction
+        open_dirs[parent] = (open_dirs[parent] & mz.DIRECTIONS_MASK) | \
+            mz.DIRECTION_BITS[mz.OPPOSITE_DIRECTION[direction]]
+
+    return mz.GridGraphMaze.from_cell_arrays(open_dirs, parent_dirs, start_coord, end_coord, seed=seed)
+
+
+if __name__ == "__main__":
+    # python maze_tiled.py [grid length] [workers] [output file]
+    grid_length = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    t0 = time.time()
+    big_maze = make_tiled_maze(grid_length, seed=0, workers=n_workers)
+    print("%d by %d maze in %.1f seconds" % (grid_length, grid_length, time.time() - t0))
+    if len(sys.argv) > 3:
+        big_maze.to_file(sys.argv[3])
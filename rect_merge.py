@@ -0,0 +1,68 @@
+import numpy as np
+
+
+def rects_mask(rects):
+    """
+    :param rects: iterable of (x, y, width, height) in whole pixels
+    :return: (mask, x0, y0), boolean (rows x columns) mask of the pixels covered by rects,
+             its top left corner at pixel (x0, y0)
+    """
+    rects = [rect for rect in rects if rect[2] > 0 and rect[3] > 0]
+    if not rects:
+        return np.zeros((0, 0), dtype=bool), 0, 0
+    x0 = min(x for x, _, _, _ in rects)
+    y0 = min(y for _, y, _, _ in rects)
+    x1 = max(x + w for x, _, w, _ in rects)
+    y1 = max(y + h for _, y, _, h in rects)
+    mask = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+    for x, y, w, h in rects:
+        mask[y - y0:y - y0 + h, x - x0:x - x0 + w] = True
+    return mask, x0, y0
+
+
+def sweep_rects(mask):
+    """
+    Run-length sweep: covers mask row by row with horizontal runs of set pixels; a run carried on
+    unchanged (same columns) by the next row grows the same rectangle downwards.
+    :param mask: boolean (rows x columns) array
+    :return: list of (x, y, width, height) of disjoint rectangles covering exactly the set pixels
+    """
+    n_rows = len(mask)
+    # +1 where a run starts, -1 one past where it ends
+    edges = np.diff(mask.astype(np.int8), axis=1, prepend=0, append=0)
+    rects = []
+    open_runs = {}  # (start, stop) => row the rectangle started at
+    for y in range(n_rows + 1):
+        runs = set()
+        if y < n_rows:
+            row_edges = edges[y]
+            runs = set(zip(np.flatnonzero(row_edges == 1).tolist(), np.flatnonzero(row_edges == -1).tolist()))
+        for run in [run for run in open_runs if run not in runs]:
+            start, stop = run
+            top = open_runs.pop(run)
+            rects.append((start, top, stop - start, y - top))
+        for run in runs:
+            if run not in open_runs:
+                open_runs[run] = y
+    return rects
+
+
+def merge_rects(rects):
+    """
+    Replaces rects (e.g. wall segments, overlapping or touching) by fewer, maximal rectangles
+    covering exactly the same pixels: horizontal bars from a row sweep, vertical bars from a column
+    sweep, each kept where it is the long way round, and a last row sweep for the pixels neither covers.
+    Result rectangles may overlap each other.
+
+    :param rects: iterable of (x, y, width, height) in whole pixels
+    :return: list of (x, y, width, height)
+    """
+    mask, x0, y0 = rects_mask(rects)
+    covered = np.zeros_like(mask)
+
+    merged = [(x, y, w, h) for x, y, w, h in sweep_rects(mask) if w >= h]
+    merged += [(x, y, w, h) for y, x, h, w in sweep_rects(mask.T) if h > w]
+    for x, y, w, h in merged:
+        covered[y:y + h, x:x + w] = True
+    merged += sweep_rects(mask & ~covered)
+    return [(x + x0, y + y0, w, h) for x, y, w, h in merged]
@@ -0,0 +1,62 @@
+class SpatialHash:
+    def __init__(self, bucket_size):
+        """
+        Uniform grid index of sprites by their rect: the plane is cut into square buckets of
+        bucket_size pixels and every sprite is listed in each bucket its rect overlaps.
+        Queries only look at the buckets around the queried rect / point, so their cost
+        depends on how crowded that spot is, not on the number of sprites.
+        Sprites are expected not to move while indexed (e.g. maze walls).
+
+        :param bucket_size: side of a bucket in pixels (e.g. the side of a maze cell)
+        """
+        self.bucket_size = bucket_size
+        self.buckets = {}  # (column, row) => [sprite]
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    def bucket_range(self, left, top, right, bottom):
+        """
+        :return: (columns, rows) ranges of the buckets overlapping the box [left, right) x [top, bottom)
+        """
+        size = self.bucket_size
+        return (range(int(left // size), int((right - 1) // size) + 1),
+                range(int(top // size), int((bottom - 1) // size) + 1))
+
+    def add(self, sprite):
+        """
+        Lists sprite in every bucket its rect overlaps
+        """
+        rect = sprite.rect
+        columns, rows = self.bucket_range(rect.left, rect.top, rect.right, rect.bottom)
+        for row in rows:
+            for column in columns:
+                self.buckets.setdefault((column, row), []).append(sprite)
+
+    def add_all(self, sprites):
+        for sprite in sprites:
+            self.add(sprite)
+
+    def query_rect(self, rect):
+        """
+        :param rect: pygame.Rect
+        :return: list of indexed sprites whose rect collides with rect (colliderect), each once
+        """
+        columns, rows = self.bucket_range(rect.left, rect.top, rect.right, rect.bottom)
+        found = {}
+        for row in rows:
+            for column in columns:
+                for sprite in self.buckets.get((column, row), ()):
+                    if sprite.rect.colliderect(rect):
+                        found[sprite] = None
+        return list(found)
+
+    def query_point(self, x, y):
+        """
+        :return: list of indexed sprites whose rect contains the point (x, y) (collidepoint)
+        """
+        # collidepoint takes whole pixels (truncated), so does the bucket lookup
+        x, y = int(x), int(y)
+        size = self.bucket_size
+        return [sprite for sprite in self.buckets.get((int(x // size), int(y // size)), ())
+                if sprite.rect.collidepoint(x, y)]